@@ -2,14 +2,18 @@
 Authentication API routes
 """
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_current_user
+from app.core.security import (
+    verify_password, create_access_token, get_current_user,
+    oauth2_scheme, revoke_token
+)
 from app.models import User
 from app.schemas.auth import Token, UserLogin, UserRegister, UserResponse
+from app.services.audit import record_audit_event
 from app.services.auth_service import AuthService
 
 router = APIRouter()
@@ -17,13 +21,14 @@ router = APIRouter()
 
 @router.post("/login", response_model=Token)
 async def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login endpoint - authenticate user and return JWT token
     """
-    user = AuthService.authenticate_user(db, form_data.username, form_data.password)
+    user = await AuthService.authenticate_user(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -44,9 +49,18 @@ async def login(
         expires_delta=access_token_expires
     )
     
-    # Update last login
-    AuthService.update_last_login(db, user.id)
-    
+    # Update last login after the response is sent - the write is
+    # non-critical, so its round-trip stays off the login critical path
+    background_tasks.add_task(AuthService.record_login, user.id)
+
+    await record_audit_event(
+        action="login",
+        resource_type="user",
+        organization_id=user.organization_id,
+        user_id=user.id,
+        resource_id=str(user.id)
+    )
+
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -55,7 +69,7 @@ async def login(
             "username": user.username,
             "email": user.email,
             "full_name": user.full_name,
-            "role": user.role,
+            "role": user.role.name.lower(),
             "organization_id": user.organization_id
         }
     }
@@ -64,38 +78,30 @@ async def login(
 @router.post("/register", response_model=UserResponse)
 async def register(
     user_data: UserRegister,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register new user endpoint
     """
-    # Check if username already exists
-    if AuthService.get_user_by_username(db, user_data.username):
+    # Check username and email availability in a single round-trip
+    conflict = await AuthService.find_registration_conflict(
+        db, user_data.username, user_data.email
+    )
+    if conflict == "username":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
-    
-    # Check if email already exists
-    if AuthService.get_user_by_email(db, user_data.email):
+    if conflict == "email":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
+
     # Create new user
-    user = AuthService.create_user(db, user_data)
-    
-    return UserResponse(
-        id=user.id,
-        username=user.username,
-        email=user.email,
-        full_name=user.full_name,
-        role=user.role,
-        organization_id=user.organization_id,
-        is_active=user.is_active,
-        created_at=user.created_at
-    )
+    user = await AuthService.create_user(db, user_data)
+
+    return UserResponse.model_validate(user)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -103,17 +109,7 @@ async def read_current_user(current_user: User = Depends(get_current_user)):
     """
     Get current user information
     """
-    return UserResponse(
-        id=current_user.id,
-        username=current_user.username,
-        email=current_user.email,
-        full_name=current_user.full_name,
-        role=current_user.role,
-        organization_id=current_user.organization_id,
-        is_active=current_user.is_active,
-        created_at=current_user.created_at,
-        last_login=current_user.last_login
-    )
+    return UserResponse.model_validate(current_user)
 
 
 @router.post("/refresh", response_model=Token)
@@ -134,8 +130,12 @@ async def refresh_token(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme)
+):
     """
-    Logout endpoint (client should discard token)
+    Logout endpoint - revoke token server-side (client should also discard it)
     """
+    revoke_token(token)
     return {"message": "Successfully logged out"}
\ No newline at end of file
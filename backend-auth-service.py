@@ -0,0 +1,111 @@
+"""
+Authentication service - user lookup, creation and credential checks
+"""
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.core.database import AsyncSessionLocal
+from app.core.security import (
+    verify_password, get_password_hash, password_needs_rehash, DUMMY_PASSWORD_HASH
+)
+from app.models import User
+from app.schemas.auth import UserRegister
+
+
+class AuthService:
+    """Authentication and user-account operations"""
+
+    @staticmethod
+    async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+        """Get a user by username"""
+        result = await db.execute(select(User).where(User.username == username))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """Get a user by email"""
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def find_registration_conflict(
+        db: AsyncSession,
+        username: str,
+        email: str
+    ) -> Optional[str]:
+        """
+        Check username and email availability in one query.
+
+        Returns "username" or "email" naming the conflicting column, or
+        None when both are free - a single round-trip instead of two
+        existence SELECTs.
+        """
+        result = await db.execute(
+            select(User.username, User.email)
+            .where((User.username == username) | (User.email == email))
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        return "username" if row.username == username else "email"
+
+    @staticmethod
+    async def create_user(db: AsyncSession, user_data: UserRegister) -> User:
+        """Create a new user with a hashed password"""
+        user = User(
+            username=user_data.username,
+            email=user_data.email,
+            hashed_password=await get_password_hash(user_data.password),
+            full_name=user_data.full_name,
+            organization_id=user_data.organization_id
+        )
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+        return user
+
+    @staticmethod
+    async def authenticate_user(
+        db: AsyncSession,
+        username: str,
+        password: str
+    ) -> Optional[User]:
+        """Authenticate a user by username and password"""
+        user = await AuthService.get_user_by_username(db, username)
+        if not user:
+            # Burn the same CPU as a real check so response timing doesn't
+            # reveal whether the username exists
+            await verify_password(password, DUMMY_PASSWORD_HASH)
+            return None
+        if not await verify_password(password, user.hashed_password):
+            return None
+        if password_needs_rehash(user.hashed_password):
+            # Transparent migration off deprecated schemes (bcrypt): the
+            # plaintext is only available here, so re-hash with the
+            # current scheme while we hold it
+            user.hashed_password = await get_password_hash(password)
+            await db.commit()
+        return user
+
+    @staticmethod
+    async def update_last_login(db: AsyncSession, user_id: int) -> None:
+        """Record a successful login"""
+        await db.execute(
+            update(User).where(User.id == user_id).values(last_login=func.now())
+        )
+        await db.commit()
+
+    @staticmethod
+    async def record_login(user_id: int) -> None:
+        """
+        Background-task form of update_last_login.
+
+        Runs after the response is sent, when the request-scoped session
+        is already closed, so it opens its own short-lived session.
+        """
+        async with AsyncSessionLocal() as db:
+            await AuthService.update_last_login(db, user_id)
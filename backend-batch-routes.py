@@ -0,0 +1,190 @@
+"""
+Batch API routes - coalesce several read requests into one round-trip
+"""
+import asyncio
+from typing import Any, Dict
+from uuid import UUID
+
+import redis.asyncio as aioredis
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.security import get_current_user
+from app.models import User
+from app.schemas.auth import UserResponse
+from app.schemas.batch import BatchRequest, BatchResponse, BatchSubResponse
+from app.schemas.chat import ConversationResponse, MessageList
+from app.services.chat_service import ChatService
+
+router = APIRouter()
+
+# Compiled once at import; same batched validate/serialize as the messages
+# route uses
+_message_list_adapter = TypeAdapter(MessageList)
+
+
+def _conversation_id(params: Dict[str, Any]) -> int:
+    cid = params.get("conversation_id")
+    if cid is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="conversation_id is required"
+        )
+    return int(cid)
+
+
+# Sub-request handlers mirror their route counterparts but stop at the
+# service layer: they take the session/redis client handed to them and
+# return plain serializable data, never a Response object. Route handlers
+# are not reused here - their dependency parameters only resolve under
+# FastAPI's injection, and some return pre-encoded responses that can't
+# nest inside a BatchSubResponse.
+
+async def _sub_me(db, redis_client, current_user: User, params: Dict[str, Any]):
+    return UserResponse.model_validate(current_user)
+
+
+async def _sub_conversations(db, redis_client, current_user: User, params: Dict[str, Any]):
+    conversations = await ChatService.get_user_conversations(
+        db=db,
+        user_id=current_user.id,
+        limit=int(params.get("limit", 50)),
+        offset=int(params.get("offset", 0))
+    )
+    return [
+        {
+            "id": conv.id,
+            "title": conv.title,
+            "model_used": conv.model_used,
+            "created_at": conv.created_at,
+            "updated_at": conv.updated_at,
+            "message_count": conv.message_count,
+        }
+        for conv in conversations
+    ]
+
+
+async def _sub_conversation(db, redis_client, current_user: User, params: Dict[str, Any]):
+    conversation_id = _conversation_id(params)
+
+    cached = await ChatService.cache_get_conversation(redis_client, conversation_id)
+    if cached and cached.get("user_id") == current_user.id:
+        return cached["view"]
+
+    conversation = await ChatService.get_conversation_by_id(
+        db=db,
+        conversation_id=conversation_id,
+        user_id=current_user.id,
+        with_messages=True
+    )
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+
+    response = ConversationResponse.model_validate(conversation)
+    await ChatService.cache_set_conversation(
+        redis_client,
+        conversation_id,
+        {"user_id": current_user.id, "view": response.model_dump(mode="json")}
+    )
+    return response
+
+
+async def _sub_conversation_messages(db, redis_client, current_user: User, params: Dict[str, Any]):
+    conversation_id = _conversation_id(params)
+    cursor = params.get("cursor")
+    limit = int(params.get("limit", 100))
+
+    messages = await ChatService.get_conversation_messages(
+        db=db,
+        conversation_id=conversation_id,
+        user_id=current_user.id,
+        limit=limit,
+        offset=int(params.get("offset", 0)),
+        cursor_id=UUID(cursor) if cursor else None
+    )
+
+    if not messages:
+        conversation = await ChatService.get_conversation_by_id(
+            db=db,
+            conversation_id=conversation_id,
+            user_id=current_user.id
+        )
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+
+    next_cursor = messages[-1].id if messages and len(messages) == limit else None
+    return _message_list_adapter.validate_python(
+        {"items": messages, "next_cursor": next_cursor},
+        from_attributes=True
+    )
+
+
+# Auth happens once for the whole batch; only side-effect-free GET paths
+# are exposed
+_DISPATCH = {
+    ("GET", "/me"): _sub_me,
+    ("GET", "/conversations"): _sub_conversations,
+    ("GET", "/conversations/{conversation_id}"): _sub_conversation,
+    ("GET", "/conversations/{conversation_id}/messages"): _sub_conversation_messages,
+}
+
+
+async def _run_sub_request(
+    handler,
+    params: Dict[str, Any],
+    current_user: User,
+    redis_client: aioredis.Redis
+) -> BatchSubResponse:
+    """Run one sub-request with its own session and map errors to entries"""
+    try:
+        async with AsyncSessionLocal() as db:
+            data = await handler(db, redis_client, current_user, params)
+        return BatchSubResponse(status=200, data=data)
+    except HTTPException as exc:
+        return BatchSubResponse(status=exc.status_code, error=str(exc.detail))
+    except (TypeError, ValueError) as exc:
+        return BatchSubResponse(status=400, error=f"Invalid parameters: {exc}")
+    except Exception as exc:
+        return BatchSubResponse(status=500, error=str(exc))
+
+
+@router.post("/_batch", response_model=BatchResponse)
+async def batch(
+    request: Request,
+    payload: BatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execute several read requests in one HTTP round-trip.
+
+    The caller is authenticated once for the whole batch; sub-requests run
+    concurrently, each against its own database session.
+    """
+    if len(payload.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size exceeds limit of {settings.BATCH_MAX_REQUESTS}"
+        )
+
+    redis_client = aioredis.Redis(connection_pool=request.app.state.redis_pool)
+
+    coros = []
+    for sub in payload.requests:
+        handler = _DISPATCH.get((sub.method.upper(), sub.path))
+        if handler is None:
+            async def _unknown(path=sub.path):
+                return BatchSubResponse(status=404, error=f"Unknown batch path: {path}")
+            coros.append(_unknown())
+        else:
+            coros.append(_run_sub_request(handler, sub.params, current_user, redis_client))
+
+    responses = await asyncio.gather(*coros)
+    return BatchResponse(responses=list(responses))
@@ -1,38 +1,62 @@
 """
 Chat API routes
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import time
+from typing import List, Optional
+from uuid import UUID
 
-from app.core.database import get_db
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db, get_redis, AsyncSessionLocal
 from app.core.security import get_current_user
 from app.models import User, Conversation, Message
 from app.schemas.chat import (
     ChatMessage, ChatResponse, ConversationCreate, ConversationResponse,
-    MessageResponse, ConversationList
+    MessageResponse, MessageList, ConversationList
 )
+from app.services.audit import record_audit_event
 from app.services.chat_service import ChatService
-from app.services.llm_service import LLMService
+from app.services.model_registry import is_known_model, model_name
 
 router = APIRouter()
 
+# Compiled once at import; validates and serializes the whole message page
+# in pydantic-core (Rust) instead of per-item Python getattr loops
+_message_list_adapter = TypeAdapter(MessageList)
+
 
 @router.post("/conversations", response_model=ConversationResponse)
 async def create_conversation(
     conversation_data: ConversationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new conversation
     """
-    conversation = ChatService.create_conversation(
+    # Client-supplied names must already exist in the registry; otherwise
+    # any request payload could grow the models table and its caches
+    if conversation_data.model is not None and not is_known_model(conversation_data.model):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown model: {conversation_data.model}"
+        )
+
+    # Fall back to the configured default: new users have no preference
+    # yet, and Conversation.model_id is non-nullable
+    conversation = await ChatService.create_conversation(
         db=db,
         user_id=current_user.id,
         organization_id=current_user.organization_id,
         title=conversation_data.title,
         model=conversation_data.model or current_user.preferred_model
+        or settings.DEFAULT_MODEL
     )
     
     return ConversationResponse(
@@ -45,32 +69,39 @@ async def create_conversation(
     )
 
 
-@router.get("/conversations", response_model=List[ConversationResponse])
+@router.get(
+    "/conversations",
+    responses={200: {"model": List[ConversationResponse]}}
+)
 async def get_user_conversations(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     limit: int = 50,
     offset: int = 0
 ):
     """
     Get user's conversations
+
+    Serialized straight to orjson (the app default) - the rows come from
+    our own query, so the response_model revalidation pass is skipped on
+    this hot path.
     """
-    conversations = ChatService.get_user_conversations(
+    conversations = await ChatService.get_user_conversations(
         db=db,
         user_id=current_user.id,
         limit=limit,
         offset=offset
     )
-    
+
     return [
-        ConversationResponse(
-            id=conv.id,
-            title=conv.title,
-            model_used=conv.model_used,
-            created_at=conv.created_at,
-            updated_at=conv.updated_at,
-            message_count=len(conv.messages)
-        )
+        {
+            "id": conv.id,
+            "title": conv.title,
+            "model_used": conv.model_used,
+            "created_at": conv.created_at,
+            "updated_at": conv.updated_at,
+            "message_count": conv.message_count,
+        }
         for conv in conversations
     ]
 
@@ -79,157 +110,205 @@ async def get_user_conversations(
 async def get_conversation(
     conversation_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
 ):
     """
     Get specific conversation with messages
     """
-    conversation = ChatService.get_conversation_by_id(
+    # Hot read path: serve the cached view when present (owner-checked)
+    cached = await ChatService.cache_get_conversation(redis, conversation_id)
+    if cached and cached.get("user_id") == current_user.id:
+        return cached["view"]
+
+    conversation = await ChatService.get_conversation_by_id(
         db=db,
         conversation_id=conversation_id,
-        user_id=current_user.id
+        user_id=current_user.id,
+        with_messages=True
     )
-    
+
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
-    
-    return ConversationResponse(
-        id=conversation.id,
-        title=conversation.title,
-        model_used=conversation.model_used,
-        created_at=conversation.created_at,
-        updated_at=conversation.updated_at,
-        message_count=len(conversation.messages),
-        messages=[
-            MessageResponse(
-                id=msg.id,
-                content=msg.content,
-                message_type=msg.message_type,
-                model_used=msg.model_used,
-                token_count=msg.token_count,
-                processing_time=msg.processing_time,
-                created_at=msg.created_at,
-                metadata=msg.metadata
-            )
-            for msg in conversation.messages
-        ]
+
+    # message_count is the trigger-maintained column; messages are
+    # eager-loaded, so model_validate reads everything off the ORM object
+    response = ConversationResponse.model_validate(conversation)
+
+    await ChatService.cache_set_conversation(
+        redis,
+        conversation_id,
+        {"user_id": current_user.id, "view": response.model_dump(mode="json")}
     )
 
+    return response
+
 
-@router.post("/conversations/{conversation_id}/messages", response_model=ChatResponse)
+@router.post(
+    "/conversations/{conversation_id}/messages",
+    responses={200: {"model": ChatResponse}}
+)
 async def send_message(
+    request: Request,
     conversation_id: int,
     message: ChatMessage,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
 ):
     """
-    Send a message and get AI response
+    Send a message and stream the AI response as server-sent events
+
+    Tokens are forwarded to the client as they arrive instead of buffering
+    the full completion; the assistant message is persisted once the
+    stream finishes, followed by a final `done` event with its metadata.
     """
-    # Verify conversation belongs to user
-    conversation = ChatService.get_conversation_by_id(
-        db=db,
-        conversation_id=conversation_id,
-        user_id=current_user.id
-    )
-    
-    if not conversation:
+    # Same registry gate as conversation creation
+    if message.model is not None and not is_known_model(message.model):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown model: {message.model}"
         )
-    
-    # Save user message
-    user_message = ChatService.create_message(
+
+    # Guarded insert: the ownership check rides inside the INSERT, so the
+    # user message is persisted (before streaming starts, surviving any
+    # mid-stream failure) and authorization costs no extra round-trip
+    user_message_id = await ChatService.create_message_checked(
         db=db,
         conversation_id=conversation_id,
         user_id=current_user.id,
         content=message.content,
         message_type="user"
     )
-    
-    try:
-        # Get AI response
-        llm_service = LLMService()
-        ai_response = await llm_service.generate_response(
-            model=message.model or conversation.model_used,
-            messages=ChatService.get_conversation_history(db, conversation_id),
-            user_context={
-                "user_id": current_user.id,
-                "organization_id": current_user.organization_id,
-                "role": current_user.role
-            }
-        )
-        
-        # Save AI message
-        ai_message = ChatService.create_message(
-            db=db,
-            conversation_id=conversation_id,
-            user_id=current_user.id,
-            content=ai_response.content,
-            message_type="assistant",
-            model_used=ai_response.model,
-            token_count=ai_response.token_count,
-            processing_time=ai_response.processing_time,
-            metadata=ai_response.metadata
-        )
-        
-        # Update conversation timestamp
-        ChatService.update_conversation_timestamp(db, conversation_id)
-        
-        return ChatResponse(
-            conversation_id=conversation_id,
-            message_id=ai_message.id,
-            content=ai_response.content,
-            model_used=ai_response.model,
-            token_count=ai_response.token_count,
-            processing_time=ai_response.processing_time,
-            metadata=ai_response.metadata
-        )
-        
-    except Exception as e:
-        # Log error and return error message
-        error_message = ChatService.create_message(
-            db=db,
-            conversation_id=conversation_id,
-            user_id=current_user.id,
-            content=f"I apologize, but I encountered an error processing your request: {str(e)}",
-            message_type="assistant",
-            metadata={"error": True, "error_message": str(e)}
-        )
-        
+
+    if user_message_id is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate AI response"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
         )
 
+    # The cached view is stale the moment the user message commits; drop
+    # it here so reads during the stream (and after a failed stream, which
+    # never reaches the post-stream invalidation) rebuild from the database
+    await ChatService.invalidate_conversation_cache(redis, conversation_id)
+
+    model = message.model
+    if model is None:
+        # Cheap PK lookup, only when the client didn't pin a model; the
+        # id comes off the row and the name from the in-memory registry
+        model = model_name(await db.scalar(
+            select(Conversation.model_id).where(Conversation.id == conversation_id)
+        ))
+
+    history = await ChatService.get_conversation_history(db, conversation_id)
+
+    await record_audit_event(
+        action="message.send",
+        resource_type="conversation",
+        organization_id=current_user.organization_id,
+        user_id=current_user.id,
+        resource_id=str(conversation_id)
+    )
+
+    async def event_stream():
+        # The request-scoped session may be torn down while the stream is
+        # still running; persistence uses its own short-lived session.
+        # The LLM service is the single shared instance built at startup.
+        llm_service = request.app.state.llm_service
+        chunks = []
+        started = time.perf_counter()
+
+        try:
+            async for token in llm_service.stream_response(
+                model=model,
+                messages=history,
+                user_context={
+                    "user_id": current_user.id,
+                    "organization_id": current_user.organization_id,
+                    "role": current_user.role.name.lower()
+                }
+            ):
+                chunks.append(token)
+                yield b"data: " + orjson.dumps({"token": token}) + b"\n\n"
+
+            content = "".join(chunks)
+            processing_time = time.perf_counter() - started
+
+            # One INSERT ... RETURNING; the trigger maintains the
+            # conversation's counters and recency columns in the same turn
+            async with AsyncSessionLocal() as session:
+                message_id = await ChatService.persist_assistant_message(
+                    db=session,
+                    conversation_id=conversation_id,
+                    user_id=current_user.id,
+                    content=content,
+                    model_used=model,
+                    processing_time=processing_time
+                )
+
+            await ChatService.invalidate_conversation_cache(redis, conversation_id)
+
+            yield b"event: done\ndata: " + orjson.dumps({
+                "conversation_id": conversation_id,
+                "message_id": message_id,
+                "model_used": model,
+                "processing_time": processing_time,
+            }) + b"\n\n"
+
+        except Exception as e:
+            # Partial reply (if any) and the error notice land as one
+            # executemany insert; the partial keeps the tokens the client
+            # already saw from vanishing on reload
+            rows = []
+            if chunks:
+                rows.append({
+                    "conversation_id": conversation_id,
+                    "user_id": current_user.id,
+                    "content": "".join(chunks),
+                    "message_type": "assistant",
+                    "message_metadata": {"partial": True, "error_message": str(e)},
+                })
+            rows.append({
+                "conversation_id": conversation_id,
+                "user_id": current_user.id,
+                "content": f"I apologize, but I encountered an error processing your request: {str(e)}",
+                "message_type": "assistant",
+                "message_metadata": {"error": True, "error_message": str(e)},
+            })
+            async with AsyncSessionLocal() as session:
+                await ChatService.bulk_create_messages(session, rows)
+            # A view re-cached mid-stream would miss the error notice
+            await ChatService.invalidate_conversation_cache(redis, conversation_id)
+            yield b"event: error\ndata: " + orjson.dumps({
+                "error": "Failed to generate AI response"
+            }) + b"\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
     conversation_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
 ):
     """
     Delete a conversation
     """
-    conversation = ChatService.get_conversation_by_id(
-        db=db,
-        conversation_id=conversation_id,
-        user_id=current_user.id
-    )
-    
-    if not conversation:
+    deleted = await ChatService.delete_conversation(db, conversation_id, current_user.id)
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
-    
-    ChatService.delete_conversation(db, conversation_id)
-    
+
+    await ChatService.invalidate_conversation_cache(redis, conversation_id)
+
     return {"message": "Conversation deleted successfully"}
 
 
@@ -238,76 +317,87 @@ async def update_conversation_title(
     conversation_id: int,
     title_update: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    redis=Depends(get_redis)
 ):
     """
     Update conversation title
     """
-    conversation = ChatService.get_conversation_by_id(
-        db=db,
-        conversation_id=conversation_id,
-        user_id=current_user.id
-    )
-    
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
-    
     new_title = title_update.get("title", "").strip()
     if not new_title:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Title cannot be empty"
         )
-    
-    ChatService.update_conversation_title(db, conversation_id, new_title)
-    
+
+    updated = await ChatService.update_conversation_title(
+        db, conversation_id, current_user.id, new_title
+    )
+
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+
+    await ChatService.invalidate_conversation_cache(redis, conversation_id)
+
     return {"message": "Title updated successfully"}
 
 
-@router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
+@router.get(
+    "/conversations/{conversation_id}/messages",
+    responses={200: {"model": MessageList}}
+)
 async def get_conversation_messages(
     conversation_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,  # Deprecated: use cursor instead
+    cursor: Optional[UUID] = None
 ):
     """
     Get messages from a specific conversation
+
+    Pass the returned next_cursor to page newest-first by keyset; the
+    offset parameter is kept for older clients but scans O(offset) rows.
     """
-    # Verify conversation access
-    conversation = ChatService.get_conversation_by_id(
-        db=db,
-        conversation_id=conversation_id,
-        user_id=current_user.id
-    )
-    
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
-    
-    messages = ChatService.get_conversation_messages(
+    # Ownership is folded into the query itself; the explicit existence
+    # check below only runs on the rare empty result
+    messages = await ChatService.get_conversation_messages(
         db=db,
         conversation_id=conversation_id,
+        user_id=current_user.id,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor_id=cursor
     )
-    
-    return [
-        MessageResponse(
-            id=msg.id,
-            content=msg.content,
-            message_type=msg.message_type,
-            model_used=msg.model_used,
-            token_count=msg.token_count,
-            processing_time=msg.processing_time,
-            created_at=msg.created_at,
-            metadata=msg.metadata
+
+    if not messages:
+        conversation = await ChatService.get_conversation_by_id(
+            db=db,
+            conversation_id=conversation_id,
+            user_id=current_user.id
         )
-        for msg in messages
-    ]
\ No newline at end of file
+        if not conversation:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+
+    # A full page means there may be more; hand back a cursor even on the
+    # first (cursorless) page so clients can enter keyset paging cold.
+    # (The messages check keeps limit=0 from indexing an empty list.)
+    next_cursor = messages[-1].id if messages and len(messages) == limit else None
+
+    # One batch validate + serialize through the precompiled adapter; the
+    # ready-made body bypasses FastAPI's per-item response_model pass
+    page = _message_list_adapter.validate_python(
+        {"items": messages, "next_cursor": next_cursor},
+        from_attributes=True
+    )
+    return Response(
+        content=_message_list_adapter.dump_json(page),
+        media_type="application/json"
+    )
\ No newline at end of file
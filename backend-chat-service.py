@@ -0,0 +1,383 @@
+"""
+Chat service - conversation and message business logic
+"""
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+import orjson
+from sqlalchemy import select, update, delete, insert, literal, JSON, Uuid
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, undefer
+from sqlalchemy.sql import func as sql_func
+
+from app.core.database import bulk_insert
+from app.models import Conversation, Message, MessageType, _ulid_as_uuid
+from app.services.model_registry import model_id_for
+
+# Conversation views are re-read many times between edits; cache the full
+# serialized view in Redis and invalidate on any write to the conversation
+CONVERSATION_CACHE_TTL = 300  # Seconds; safety net on top of invalidation
+
+
+class ChatService:
+    """Conversation and message operations"""
+
+    @staticmethod
+    def _conversation_cache_key(conversation_id: int) -> str:
+        return f"conv:{conversation_id}:view"
+
+    @staticmethod
+    async def cache_get_conversation(redis_client, conversation_id: int) -> Optional[dict]:
+        """Fetch a cached conversation view, or None on miss"""
+        blob = await redis_client.get(ChatService._conversation_cache_key(conversation_id))
+        return orjson.loads(blob) if blob else None
+
+    @staticmethod
+    async def cache_set_conversation(redis_client, conversation_id: int, payload: dict) -> None:
+        """Write-through a serialized conversation view"""
+        await redis_client.set(
+            ChatService._conversation_cache_key(conversation_id),
+            orjson.dumps(payload),
+            ex=CONVERSATION_CACHE_TTL
+        )
+
+    @staticmethod
+    async def invalidate_conversation_cache(redis_client, conversation_id: int) -> None:
+        """Drop the cached view after any write to the conversation"""
+        await redis_client.delete(ChatService._conversation_cache_key(conversation_id))
+
+    @staticmethod
+    async def create_conversation(
+        db: AsyncSession,
+        user_id: int,
+        organization_id: int,
+        title: str,
+        model: str
+    ) -> Conversation:
+        """Create a new conversation"""
+        conversation = Conversation(
+            title=title,
+            user_id=user_id,
+            organization_id=organization_id,
+            model_id=await model_id_for(model)
+        )
+        db.add(conversation)
+        await db.commit()
+        await db.refresh(conversation)
+        return conversation
+
+    @staticmethod
+    async def get_user_conversations(
+        db: AsyncSession,
+        user_id: int,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Conversation]:
+        """
+        Get a user's conversations.
+
+        message_count is a trigger-maintained column on the conversation
+        row itself, so the listing involves no aggregate at all - just an
+        index-ordered scan of the user's conversations.
+        """
+        result = await db.execute(
+            select(Conversation)
+            .where(Conversation.user_id == user_id, Conversation.is_active == True)
+            .order_by(Conversation.updated_at.desc().nulls_last())
+            .limit(limit)
+            .offset(offset)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_conversation_by_id(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        with_messages: bool = False
+    ) -> Optional[Conversation]:
+        """Get a conversation owned by the given user"""
+        stmt = select(Conversation).where(
+            Conversation.id == conversation_id,
+            Conversation.user_id == user_id
+        )
+        if with_messages:
+            # Eager-load in one extra batched SELECT instead of N lazy
+            # loads; the detail view shows bodies, so undefer content here
+            stmt = stmt.options(
+                selectinload(Conversation.messages).undefer(Message.content)
+            )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def create_message(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        content: str,
+        message_type: str,
+        model_used: Optional[str] = None,
+        token_count: int = 0,
+        processing_time: float = 0.0,
+        metadata: Optional[dict] = None,
+        commit: bool = True
+    ) -> Message:
+        """
+        Create a message in a conversation.
+
+        With commit=False the row is only flushed, so callers can bundle
+        several writes into one transaction and commit once.
+        """
+        message = Message(
+            conversation_id=conversation_id,
+            user_id=user_id,
+            content=content,
+            message_type=message_type,
+            model_id=await model_id_for(model_used),
+            token_count=token_count,
+            processing_time=processing_time,
+            message_metadata=metadata or {}
+        )
+        db.add(message)
+        if commit:
+            await db.commit()
+            await db.refresh(message)
+        else:
+            await db.flush()
+        return message
+
+    @staticmethod
+    async def bulk_create_messages(
+        db: AsyncSession,
+        rows: List[dict],
+        commit: bool = True
+    ) -> None:
+        """
+        Insert several messages in one executemany statement.
+
+        Used wherever more than one message lands at once (e.g. the
+        user/error pair on a failed LLM call) so related rows cost a
+        single round-trip instead of one per row.
+        """
+        await bulk_insert(db, Message, rows)
+        if commit:
+            await db.commit()
+
+    @staticmethod
+    async def create_message_checked(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        content: str,
+        message_type: str,
+        model_used: Optional[str] = None,
+        token_count: int = 0,
+        processing_time: float = 0.0,
+        metadata: Optional[dict] = None,
+        commit: bool = True
+    ) -> Optional[UUID]:
+        """
+        Insert a message only if the conversation belongs to the user.
+
+        The ownership check rides inside the INSERT's WHERE EXISTS, so the
+        auth round-trip and the insert are one server-side statement.
+        Returns the new message id, or None when the conversation doesn't
+        exist or isn't owned by the user.
+        """
+        # literal() bypasses IntEnumType's bind coercion; resolve the code here
+        if isinstance(message_type, str):
+            message_type = MessageType[message_type.upper()]
+        owner_exists = (
+            select(Conversation.id)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+            .exists()
+        )
+        stmt = (
+            insert(Message)
+            .from_select(
+                [
+                    "id", "conversation_id", "user_id", "content", "message_type",
+                    "model_id", "token_count", "processing_time", "message_metadata"
+                ],
+                select(
+                    # Python-side column defaults don't run for INSERT FROM
+                    # SELECT, so the ULID id is generated here
+                    literal(_ulid_as_uuid(), type_=Uuid()),
+                    literal(conversation_id),
+                    literal(user_id),
+                    literal(content),
+                    literal(int(message_type)),
+                    literal(await model_id_for(model_used)),
+                    literal(token_count),
+                    literal(processing_time),
+                    literal(metadata or {}, type_=JSON),
+                ).where(owner_exists)
+            )
+            .returning(Message.id)
+        )
+        result = await db.execute(stmt)
+        message_id = result.scalar_one_or_none()
+        if commit:
+            await db.commit()
+        return message_id
+
+    @staticmethod
+    async def persist_assistant_message(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        content: str,
+        model_used: Optional[str],
+        processing_time: float
+    ) -> UUID:
+        """
+        Persist the post-stream assistant message in one network turn.
+
+        A single core INSERT ... RETURNING: the insert trigger bumps the
+        conversation's message_count/last_message_at/updated_at server-
+        side, so no separate UPDATE round-trip is needed.
+        """
+        message_id = await db.scalar(
+            insert(Message)
+            .values(
+                conversation_id=conversation_id,
+                user_id=user_id,
+                content=content,
+                message_type=MessageType.ASSISTANT,
+                model_id=await model_id_for(model_used),
+                processing_time=processing_time,
+            )
+            .returning(Message.id)
+        )
+        await db.commit()
+        return message_id
+
+    @staticmethod
+    async def get_conversation_history(
+        db: AsyncSession,
+        conversation_id: int
+    ) -> List[dict]:
+        """Get conversation messages formatted for the LLM API"""
+        result = await db.execute(
+            select(Message.message_type, Message.content)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at)
+        )
+        return [
+            {"role": message_type.name.lower(), "content": content}
+            for message_type, content in result.all()
+        ]
+
+    @staticmethod
+    async def get_conversation_messages(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        limit: int = 100,
+        offset: int = 0,
+        cursor_id: Optional[UUID] = None
+    ) -> List[Message]:
+        """
+        Get messages from a conversation owned by the given user.
+
+        Ownership is folded into the WHERE clause rather than checked with
+        a separate SELECT. Pages are always newest-first by id (ULID ids
+        are time-ordered), so cursor and cursorless pages compose: the
+        first page needs no cursor, and each subsequent page keysets on
+        id < cursor_id, staying an index lookup regardless of page depth.
+        The offset parameter is the deprecated O(offset) fallback.
+        """
+        owner_exists = (
+            select(Conversation.id)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+            .exists()
+        )
+        # This endpoint returns bodies, so content is undeferred; summary
+        # queries elsewhere leave the Text column out of the row entirely
+        stmt = select(Message).options(undefer(Message.content)).where(
+            Message.conversation_id == conversation_id,
+            owner_exists
+        )
+        if cursor_id is not None:
+            stmt = stmt.where(Message.id < cursor_id)
+        elif offset:
+            stmt = stmt.offset(offset)
+        result = await db.execute(stmt.order_by(Message.id.desc()).limit(limit))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def update_conversation_timestamp(
+        db: AsyncSession,
+        conversation_id: int,
+        commit: bool = True
+    ) -> None:
+        """Touch a conversation's updated_at timestamp"""
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(updated_at=sql_func.now())
+        )
+        if commit:
+            await db.commit()
+
+    @staticmethod
+    async def update_conversation_title(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int,
+        title: str
+    ) -> bool:
+        """
+        Update a conversation's title; ownership is part of the UPDATE's
+        WHERE clause. Returns False when no owned row matched.
+        """
+        result = await db.execute(
+            update(Conversation)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+            .values(title=title)
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    async def delete_conversation(
+        db: AsyncSession,
+        conversation_id: int,
+        user_id: int
+    ) -> bool:
+        """
+        Delete a conversation and its messages; ownership is part of the
+        DELETE's WHERE clause. Returns False when no owned row matched.
+        """
+        owner_exists = (
+            select(Conversation.id)
+            .where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+            .exists()
+        )
+        await db.execute(
+            delete(Message).where(
+                Message.conversation_id == conversation_id,
+                owner_exists
+            )
+        )
+        result = await db.execute(
+            delete(Conversation).where(
+                Conversation.id == conversation_id,
+                Conversation.user_id == user_id
+            )
+        )
+        await db.commit()
+        return result.rowcount > 0
@@ -1,18 +1,26 @@
 """
 Olian Enterprise LLM Platform - Main FastAPI Application
 """
+from datetime import date
+from pathlib import Path
+
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer
+import orjson
 import structlog
 
-from app.core.config import settings
-from app.core.database import engine
+from app.core.config import settings, SECURITY_HEADERS_RAW
+from app.core.database import create_redis_pool, DatabaseManager
 from app.models import Base
-from app.api import auth, chat, users, training, admin
+from app.api import auth, batch, chat, users, training, admin
+from app.services.audit import start_audit_writer, stop_audit_writer
+from app.services.model_registry import load_model_registry
 
-# Configure structured logging
+# Configure structured logging; every request emits at least one line, so
+# rendering goes through orjson's C encoder rather than stdlib json.dumps
 structlog.configure(
     processors=[
         structlog.stdlib.filter_by_level,
@@ -20,9 +28,10 @@ structlog.configure(
         structlog.stdlib.add_log_level,
         structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(
+            serializer=lambda obj, **_: orjson.dumps(obj).decode()
+        )
     ],
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
@@ -38,13 +47,17 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    # orjson encodes datetime/float-heavy payloads several times faster
+    # than the stdlib encoder; applies to every route unless overridden
+    default_response_class=ORJSONResponse
 )
 
 # Security
 security = HTTPBearer()
 
-# Middleware
+# Middleware - applied in reverse add order, so TrustedHost (added last)
+# runs first and rejects unknown Host headers before any CORS work
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_HOSTS,
@@ -55,22 +68,71 @@ app.add_middleware(
 
 app.add_middleware(
     TrustedHostMiddleware,
-    allowed_hosts=settings.ALLOWED_HOSTS
+    allowed_hosts=settings.ALLOWED_HOST_NAMES
 )
 
+
+@app.middleware("http")
+async def add_security_headers(request, call_next):
+    """Attach the standard security headers to every response"""
+    response = await call_next(request)
+    # Pre-encoded at startup; extending raw_headers skips the per-request
+    # dict iteration, lowercasing and .encode() calls
+    response.raw_headers.extend(SECURITY_HEADERS_RAW)
+    return response
+
 # Database initialization
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and services on startup"""
     logger.info("Starting Olian Enterprise LLM Platform")
-    
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
+
+    # Shared async Redis pool, reused by every request via get_redis
+    app.state.redis_pool = create_redis_pool()
+
+    # Audit events are queued by handlers and batch-inserted off-path
+    app.state.audit_task = start_audit_writer()
+
+    # LLM SDKs are heavy imports (httpx, tokenizers); load them here rather
+    # than at module import so uvicorn boots fast, and share one instance
+    # (and its HTTP client) across all requests
+    from app.services.llm_service import LLMService
+    app.state.llm_service = LLMService()
+
+    # Ensure data directories exist (moved out of config import time)
+    for data_dir in (settings.UPLOAD_DIR, settings.MODELS_DIR, "data/embeddings"):
+        Path(data_dir).mkdir(parents=True, exist_ok=True)
+
+    # Dev convenience only - production schema is managed by Alembic, and
+    # create_all costs a has_table round-trip per ORM table at every boot
+    if settings.DEBUG:
+        await DatabaseManager.create_tables()
+        await DatabaseManager.create_conversation_triggers()
+        logger.info("Database tables created successfully")
+
+    # The partitioned parents reject inserts until a covering partition
+    # exists. create_monthly_partition is idempotent (CREATE TABLE IF NOT
+    # EXISTS), so seeding this month and the next on every boot is safe in
+    # every environment and keeps inserts working across month boundaries
+    # without depending on an external scheduler
+    today = date.today()
+    next_year, next_month = (
+        (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+    )
+    for table_name in ("messages", "audit_logs"):
+        await DatabaseManager.create_monthly_partition(table_name, today.year, today.month)
+        await DatabaseManager.create_monthly_partition(table_name, next_year, next_month)
+
+    # Warm the model id<->name lookup dicts so request paths translate
+    # without joining the models table
+    await load_model_registry()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    # Flushes queued audit rows before the task goes away
+    await stop_audit_writer(app.state.audit_task)
+    await app.state.redis_pool.disconnect()
     logger.info("Shutting down Olian Enterprise LLM Platform")
 
 # Health check endpoint
@@ -97,6 +159,13 @@ app.include_router(
     dependencies=[Depends(security)]
 )
 
+app.include_router(
+    batch.router,
+    prefix="/api/chat",
+    tags=["chat"],
+    dependencies=[Depends(security)]
+)
+
 app.include_router(
     users.router,
     prefix="/api/users",
@@ -0,0 +1,76 @@
+# app/services/model_registry.py
+"""
+Model registry - translates model names to lookup-table ids and back
+"""
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Model, MODEL_ID_CACHE, MODEL_NAME_CACHE
+
+
+async def load_model_registry() -> None:
+    """
+    Warm both lookup dicts from the models table; called at startup.
+
+    Also registers any configured model missing from the table (first
+    boot, new AVAILABLE_MODELS entries), so is_known_model accepts the
+    configured list from the very first request.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Model.id, Model.name))
+        for model_id, name in result.all():
+            MODEL_NAME_CACHE[model_id] = name
+            MODEL_ID_CACHE[name] = model_id
+
+    for name in settings.AVAILABLE_MODELS:
+        await model_id_for(name)  # Cache hit for already-registered names
+
+
+def model_name(model_id: Optional[int]) -> Optional[str]:
+    """id -> name from the in-memory cache; never touches the database"""
+    return MODEL_NAME_CACHE.get(model_id)
+
+
+def is_known_model(name: str) -> bool:
+    """
+    True when the name is already in the registry.
+
+    API routes gate client-supplied model names on this before they reach
+    model_id_for, so arbitrary request payloads can't grow the models
+    table - registration is reserved for trusted paths (seeding, admin
+    config, completed training jobs).
+    """
+    return name in MODEL_ID_CACHE
+
+
+async def model_id_for(name: Optional[str]) -> Optional[int]:
+    """
+    name -> id, registering names not seen before.
+
+    A cache hit (the overwhelmingly common case) costs a dict lookup; the
+    miss path upserts into models with ON CONFLICT DO NOTHING so two
+    workers racing on a new name both converge on the same row. The
+    upsert runs in its own short-lived session - committing on a caller's
+    request-scoped session would silently flush whatever else was pending
+    on it.
+    """
+    if name is None:
+        return None
+    model_id = MODEL_ID_CACHE.get(name)
+    if model_id is not None:
+        return model_id
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            pg_insert(Model).values(name=name).on_conflict_do_nothing(index_elements=["name"])
+        )
+        model_id = await session.scalar(select(Model.id).where(Model.name == name))
+        await session.commit()
+
+    MODEL_ID_CACHE[name] = model_id
+    MODEL_NAME_CACHE[model_id] = name
+    return model_id
@@ -1,227 +1,571 @@
 """
 Database models for Olian Enterprise LLM Platform
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import CheckConstraint, SmallInteger, String, Text, DateTime, ForeignKey, JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
-from enum import Enum as PyEnum
+from enum import IntEnum
+from typing import List, Optional
+import os
+import time
+import uuid
 
 from app.core.database import Base
 
+# JSONB on Postgres: binary storage (no per-read reparse) and @>/? operators
+# that GIN indexes can serve; plain JSON everywhere else (tests on SQLite)
+JSONVariant = JSON().with_variant(JSONB, "postgresql")
 
-class UserRole(PyEnum):
+
+# id -> name and name -> id lookup caches for the models table, warmed at
+# startup by the model registry service. Hot reads translate ids to names
+# here instead of joining; the dicts are tiny (one entry per known model).
+MODEL_NAME_CACHE: dict = {}
+MODEL_ID_CACHE: dict = {}
+
+
+def _ulid_as_uuid() -> uuid.UUID:
+    """
+    ULID packed into a UUID: 48-bit millisecond timestamp + 80 random bits.
+
+    Time-ordered like a sequence (so b-tree inserts stay clustered on the
+    right-edge pages and keyset pagination still works), but generated
+    client-side - no nextval() round-trip per INSERT, which matters for
+    the executemany bulk paths.
+    """
+    return uuid.UUID(
+        int=((time.time_ns() // 1_000_000) << 80)
+        | int.from_bytes(os.urandom(10), "big")
+    )
+
+
+# Enum domains are stored as 2-byte integer codes (see IntEnumType) rather
+# than String(20): smaller rows and integer equality in index scans. Codes
+# are part of the schema - append new members, never renumber.
+
+class UserRole(IntEnum):
     """User role enumeration"""
-    ADMIN = "admin"
-    USER = "user"
-    VIEWER = "viewer"
+    ADMIN = 1
+    USER = 2
+    VIEWER = 3
 
 
-class TrainingStatus(PyEnum):
+class TrainingStatus(IntEnum):
     """Training job status enumeration"""
-    PENDING = "pending"
-    RUNNING = "running"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    CANCELLED = "cancelled"
+    PENDING = 1
+    RUNNING = 2
+    COMPLETED = 3
+    FAILED = 4
+    CANCELLED = 5
+
+
+class MessageType(IntEnum):
+    """Message author enumeration"""
+    USER = 1
+    ASSISTANT = 2
+    SYSTEM = 3
+
+
+class IntEnumType(TypeDecorator):
+    """
+    SmallInteger column holding an IntEnum.
+
+    Binds members, raw ints, or legacy name strings ("user", "admin") to
+    the integer code; result rows come back as enum members.
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_cls, **kwargs):
+        super().__init__(**kwargs)
+        self.enum_cls = enum_cls
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            value = self.enum_cls[value.upper()]
+        return int(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.enum_cls(value)
+
+
+class Model(Base):
+    """LLM model lookup table - every model-name column joins here"""
+    __tablename__ = "models"
+
+    id: Mapped[int] = mapped_column(
+        SmallInteger, primary_key=True, autoincrement=True, init=False
+    )
+    name: Mapped[str] = mapped_column(String(50), unique=True)
 
 
 class Organization(Base):
     """Organization model"""
     __tablename__ = "organizations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), unique=True, index=True, nullable=False)
-    description = Column(Text)
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, init=False)
+    name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    description: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    is_active: Mapped[bool] = mapped_column(server_default=text("true"), init=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), onupdate=func.now(), init=False
+    )
+
     # Settings
-    max_users = Column(Integer, default=100)
-    max_storage_mb = Column(Integer, default=10000)  # 10GB default
-    api_rate_limit = Column(Integer, default=1000)   # Requests per hour
-    
-    # Relationships
-    users = relationship("User", back_populates="organization")
-    conversations = relationship("Conversation", back_populates="organization")
-    training_jobs = relationship("TrainingJob", back_populates="organization")
+    max_users: Mapped[int] = mapped_column(server_default=text("100"), init=False)
+    max_storage_mb: Mapped[int] = mapped_column(
+        server_default=text("10000"), init=False  # 10GB default
+    )
+    api_rate_limit: Mapped[int] = mapped_column(
+        server_default=text("1000"), init=False   # Requests per hour
+    )
+
+    # Relationships - reverse collections are unbounded and never iterated
+    # on request paths; raise on accidental access instead of lazy-loading
+    users: Mapped[List["User"]] = relationship(
+        back_populates="organization", lazy="raise", init=False
+    )
+    conversations: Mapped[List["Conversation"]] = relationship(
+        back_populates="organization", lazy="raise", init=False
+    )
+    training_jobs: Mapped[List["TrainingJob"]] = relationship(
+        back_populates="organization", lazy="raise", init=False
+    )
 
 
 class User(Base):
     """User model"""
     __tablename__ = "users"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
-    email = Column(String(255), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(255), nullable=False)
-    full_name = Column(String(255))
-    role = Column(String(20), default=UserRole.USER.value)
-    is_active = Column(Boolean, default=True)
-    last_login = Column(DateTime(timezone=True))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
-    # Organization relationship
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    organization = relationship("Organization", back_populates="users")
-    
+    # The DB is the last line of defense for the enum domain; codes match
+    # UserRole
+    __table_args__ = (CheckConstraint("role IN (1, 2, 3)", name="ck_users_role"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, init=False)
+    username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
+    email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
+    hashed_password: Mapped[str] = mapped_column(String(255))
+
+    # Organization relationship - small to-one, fetched with the user row
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id"))
+    organization: Mapped["Organization"] = relationship(
+        back_populates="users", lazy="joined", innerjoin=True, init=False
+    )
+
+    full_name: Mapped[Optional[str]] = mapped_column(String(255), default=None)
+    role: Mapped[UserRole] = mapped_column(  # server default is UserRole.USER's code
+        IntEnumType(UserRole), server_default=text("2"), index=True,
+        default=UserRole.USER
+    )
+    is_active: Mapped[bool] = mapped_column(server_default=text("true"), init=False)
+    last_login: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False
+    )
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), onupdate=func.now(), init=False
+    )
+
     # User preferences
-    preferred_model = Column(String(50), default="gpt-4")
-    ui_theme = Column(String(20), default="light")
-    
-    # Relationships
-    conversations = relationship("Conversation", back_populates="user")
-    messages = relationship("Message", back_populates="user")
+    preferred_model_id: Mapped[Optional[int]] = mapped_column(
+        SmallInteger, ForeignKey("models.id"), default=None
+    )
+    ui_theme: Mapped[str] = mapped_column(
+        String(20), server_default=text("'light'"), init=False
+    )
+
+    # Relationships - unbounded collections; query through ChatService instead
+    conversations: Mapped[List["Conversation"]] = relationship(
+        back_populates="user", lazy="raise", init=False
+    )
+    messages: Mapped[List["Message"]] = relationship(
+        back_populates="user", lazy="raise", init=False
+    )
+
+    @property
+    def preferred_model(self):
+        """Model name via the in-memory registry - no JOIN on hot reads"""
+        return MODEL_NAME_CACHE.get(self.preferred_model_id)
 
 
 class Conversation(Base):
     """Conversation model"""
     __tablename__ = "conversations"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), default="New Conversation")
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    model_used = Column(String(50), nullable=False)
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
-    
-    # Relationships
-    user = relationship("User", back_populates="conversations")
-    organization = relationship("Organization", back_populates="conversations")
-    messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, init=False)
+    title: Mapped[str] = mapped_column(
+        String(255), server_default=text("'New Conversation'")
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id"))
+    model_id: Mapped[int] = mapped_column(
+        SmallInteger, ForeignKey("models.id"), index=True
+    )
+    is_active: Mapped[bool] = mapped_column(server_default=text("true"), init=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), onupdate=func.now(), init=False
+    )
+
+    # Denormalized message stats, maintained by the triggers in
+    # CONVERSATION_COUNTER_TRIGGER_DDL - listing conversations reads these
+    # columns instead of aggregating over messages
+    message_count: Mapped[int] = mapped_column(server_default=text("0"), init=False)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False
+    )
+
+    # Relationships - messages must be loaded explicitly (selectinload in
+    # ChatService); lazy="raise" turns any accidental N+1 into a hard error
+    user: Mapped["User"] = relationship(
+        back_populates="conversations", lazy="raise", init=False
+    )
+    organization: Mapped["Organization"] = relationship(
+        back_populates="conversations", lazy="raise", init=False
+    )
+    messages: Mapped[List["Message"]] = relationship(
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        lazy="raise",
+        order_by="Message.created_at",
+        init=False
+    )
+
+    @property
+    def model_used(self):
+        """Model name via the in-memory registry - no JOIN on hot reads"""
+        return MODEL_NAME_CACHE.get(self.model_id)
+
+
+# Conversation listing filters by owner + active flag and sorts by recency
+Index(
+    "ix_conversations_user_active",
+    Conversation.user_id,
+    Conversation.is_active,
+    Conversation.updated_at
+)
 
 
 class Message(Base):
     """Message model"""
     __tablename__ = "messages"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    content = Column(Text, nullable=False)
-    message_type = Column(String(20), nullable=False)  # 'user' or 'assistant'
-    model_used = Column(String(50))
-    token_count = Column(Integer, default=0)
-    processing_time = Column(Float, default=0.0)  # Seconds
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    # Metadata for message context
-    metadata = Column(JSON, default={})
-    
-    # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
-    user = relationship("User", back_populates="messages")
+    # Monthly range partitions keep the hot (recent) index pages small;
+    # Postgres requires the partition key in the primary key, hence the
+    # composite (id, created_at) PK. Partitions are created by
+    # DatabaseManager.create_monthly_partition; retention detaches old ones.
+    __table_args__ = (
+        # Codes match MessageType; the DB rejects garbage at insert time
+        CheckConstraint("message_type IN (1, 2, 3)", name="ck_messages_type"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, index=True,
+        insert_default=_ulid_as_uuid, init=False
+    )
+    conversation_id: Mapped[int] = mapped_column(ForeignKey("conversations.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # Deferred: unbounded Text that summary views never need - queries
+    # that return message bodies undefer it explicitly
+    content: Mapped[str] = mapped_column(Text, deferred=True)
+    message_type: Mapped[MessageType] = mapped_column(IntEnumType(MessageType))
+    model_id: Mapped[Optional[int]] = mapped_column(
+        SmallInteger, ForeignKey("models.id"), index=True, default=None
+    )
+    token_count: Mapped[int] = mapped_column(server_default=text("0"), default=0)
+    processing_time: Mapped[float] = mapped_column(
+        server_default=text("0"), default=0.0  # Seconds
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now(),
+        init=False
+    )
+
+    # Metadata for message context. Mapped as message_metadata because
+    # `metadata` shadows DeclarativeBase.metadata; the DB column keeps its
+    # name. default_factory avoids the shared-mutable-default footgun.
+    message_metadata: Mapped[dict] = mapped_column(
+        "metadata", JSONVariant, server_default=text("'{}'"), default_factory=dict
+    )
+
+    # Relationships - never traversed from a loaded Message on request paths
+    conversation: Mapped["Conversation"] = relationship(
+        back_populates="messages", lazy="raise", init=False
+    )
+    user: Mapped["User"] = relationship(
+        back_populates="messages", lazy="raise", init=False
+    )
+
+    @property
+    def model_used(self):
+        """Model name via the in-memory registry - no JOIN on hot reads"""
+        return MODEL_NAME_CACHE.get(self.model_id)
+
+
+# Keyset pagination: (conversation_id, id DESC) keeps page fetches O(log n)
+# no matter how deep the client paginates
+Index("ix_messages_conv_id_desc", Message.conversation_id, Message.id.desc())
+
+# Chronological reads within a conversation; message_type rides along as an
+# INCLUDE column so history queries can be answered from the index alone
+# (content is deliberately excluded - unbounded Text doesn't belong in an index)
+Index(
+    "ix_messages_conv_created",
+    Message.conversation_id,
+    Message.created_at,
+    postgresql_include=["message_type"]
+)
+
+
+# Keeps conversations.message_count/last_message_at in step with message
+# INSERTs and DELETEs; applied by DatabaseManager.create_conversation_triggers
+# and mirrored in Alembic. The O(messages) aggregate becomes an O(1) read.
+CONVERSATION_COUNTER_TRIGGER_DDL = (
+    """CREATE OR REPLACE FUNCTION conversations_bump_message_count() RETURNS trigger AS $$
+BEGIN
+    UPDATE conversations
+       SET message_count = message_count + 1,
+           last_message_at = NEW.created_at,
+           updated_at = NEW.created_at
+     WHERE id = NEW.conversation_id;
+    RETURN NEW;
+END $$ LANGUAGE plpgsql""",
+    """CREATE OR REPLACE FUNCTION conversations_drop_message_count() RETURNS trigger AS $$
+BEGIN
+    UPDATE conversations
+       SET message_count = message_count - 1
+     WHERE id = OLD.conversation_id;
+    RETURN OLD;
+END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS trg_messages_bump_count ON messages",
+    "CREATE TRIGGER trg_messages_bump_count AFTER INSERT ON messages "
+    "FOR EACH ROW EXECUTE FUNCTION conversations_bump_message_count()",
+    "DROP TRIGGER IF EXISTS trg_messages_drop_count ON messages",
+    "CREATE TRIGGER trg_messages_drop_count AFTER DELETE ON messages "
+    "FOR EACH ROW EXECUTE FUNCTION conversations_drop_message_count()",
+)
 
 
 class Document(Base):
     """Document model for training data"""
     __tablename__ = "documents"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String(255), nullable=False)
-    original_filename = Column(String(255), nullable=False)
-    file_path = Column(String(500), nullable=False)
-    file_size = Column(Integer, nullable=False)  # Size in bytes
-    mime_type = Column(String(100), nullable=False)
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, init=False)
+    filename: Mapped[str] = mapped_column(String(255))
+    original_filename: Mapped[str] = mapped_column(String(255))
+    file_path: Mapped[str] = mapped_column(String(500))
+    file_size: Mapped[int] = mapped_column()  # Size in bytes
+    mime_type: Mapped[str] = mapped_column(String(100))
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id"))
+    uploaded_by: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
     # Processing status
-    is_processed = Column(Boolean, default=False)
-    processing_error = Column(Text)
-    
+    is_processed: Mapped[bool] = mapped_column(
+        server_default=text("false"), init=False
+    )
+    processing_error: Mapped[Optional[str]] = mapped_column(
+        Text, deferred=True, init=False  # Only shown on the detail view
+    )
+
     # Content metadata
-    page_count = Column(Integer)
-    word_count = Column(Integer)
-    character_count = Column(Integer)
-    
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    processed_at = Column(DateTime(timezone=True))
-    
-    # Relationships
-    organization = relationship("Organization")
-    uploaded_by_user = relationship("User")
+    page_count: Mapped[Optional[int]] = mapped_column(default=None)
+    word_count: Mapped[Optional[int]] = mapped_column(default=None)
+    character_count: Mapped[Optional[int]] = mapped_column(default=None)
+
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
+    processed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False
+    )
+
+    # Relationships - document views render ids, not joined org/user rows;
+    # raise on accidental access like the other to-one edges
+    organization: Mapped["Organization"] = relationship(lazy="raise", init=False)
+    uploaded_by_user: Mapped["User"] = relationship(lazy="raise", init=False)
 
 
 class TrainingJob(Base):
     """Model training job"""
     __tablename__ = "training_jobs"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    job_name = Column(String(255), nullable=False)
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
-    
+    # Codes match TrainingStatus
+    __table_args__ = (
+        CheckConstraint("status BETWEEN 1 AND 5", name="ck_training_jobs_status"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, init=False)
+    job_name: Mapped[str] = mapped_column(String(255))
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id"))
+    created_by: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
     # Job configuration
-    base_model = Column(String(100), nullable=False)
-    training_data_path = Column(String(500))
-    hyperparameters = Column(JSON, default={})
-    
+    base_model_id: Mapped[int] = mapped_column(SmallInteger, ForeignKey("models.id"))
+    training_data_path: Mapped[Optional[str]] = mapped_column(
+        String(500), default=None
+    )
+    hyperparameters: Mapped[dict] = mapped_column(
+        JSONVariant, server_default=text("'{}'"), default_factory=dict
+    )
+
     # Job status and progress
-    status = Column(String(20), default=TrainingStatus.PENDING.value)
-    progress_percentage = Column(Float, default=0.0)
-    current_step = Column(Integer, default=0)
-    total_steps = Column(Integer, default=0)
-    
+    status: Mapped[TrainingStatus] = mapped_column(
+        # server default is TrainingStatus.PENDING's code
+        IntEnumType(TrainingStatus), server_default=text("1"), init=False
+    )
+    progress_percentage: Mapped[float] = mapped_column(
+        server_default=text("0"), init=False
+    )
+    current_step: Mapped[int] = mapped_column(server_default=text("0"), init=False)
+    total_steps: Mapped[int] = mapped_column(server_default=text("0"), init=False)
+
     # Results and metrics
-    final_loss = Column(Float)
-    validation_accuracy = Column(Float)
-    training_metrics = Column(JSON, default={})
-    
+    final_loss: Mapped[Optional[float]] = mapped_column(init=False)
+    validation_accuracy: Mapped[Optional[float]] = mapped_column(init=False)
+    training_metrics: Mapped[dict] = mapped_column(
+        JSONVariant, server_default=text("'{}'"), default_factory=dict
+    )
+
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    started_at = Column(DateTime(timezone=True))
-    completed_at = Column(DateTime(timezone=True))
-    
-    # Error handling
-    error_message = Column(Text)
-    
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False
+    )
+
+    # Error handling - deferred; only the job detail view reads it
+    error_message: Mapped[Optional[str]] = mapped_column(
+        Text, deferred=True, init=False
+    )
+
     # Model output
-    model_path = Column(String(500))
-    model_size_mb = Column(Float)
-    
-    # Relationships
-    organization = relationship("Organization", back_populates="training_jobs")
-    created_by_user = relationship("User")
+    model_path: Mapped[Optional[str]] = mapped_column(String(500), init=False)
+    model_size_mb: Mapped[Optional[float]] = mapped_column(init=False)
+
+    # Relationships - never traversed on request paths (dashboards filter
+    # by organization_id directly); raise instead of lazy-loading
+    organization: Mapped["Organization"] = relationship(
+        back_populates="training_jobs", lazy="raise", init=False
+    )
+    created_by_user: Mapped["User"] = relationship(lazy="raise", init=False)
+
+    @property
+    def base_model(self):
+        """Model name via the in-memory registry - no JOIN on hot reads"""
+        return MODEL_NAME_CACHE.get(self.base_model_id)
+
+
+# Training dashboards filter by organization + job status
+Index("ix_training_org_status", TrainingJob.organization_id, TrainingJob.status)
+
+# Experiment queries probe into recorded metrics (training_metrics @>
+# '{"early_stopped": true}' and the like); GIN serves those the same way
+# ix_audit_details_gin serves audit filters. Postgres-only.
+Index(
+    "ix_training_metrics_gin",
+    TrainingJob.training_metrics,
+    postgresql_using="gin"
+)
 
 
 class APIKey(Base):
     """API key management for external LLM services"""
     __tablename__ = "api_keys"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    service_name = Column(String(50), nullable=False)  # 'openai', 'anthropic', etc.
-    encrypted_key = Column(String(500), nullable=False)
-    is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    last_used = Column(DateTime(timezone=True))
-    
-    # Usage tracking
-    request_count = Column(Integer, default=0)
-    total_tokens = Column(Integer, default=0)
-    
-    # Relationships
-    organization = relationship("Organization")
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True, init=False)
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id"))
+    service_name: Mapped[str] = mapped_column(
+        String(50)  # 'openai', 'anthropic', etc.
+    )
+    is_active: Mapped[bool] = mapped_column(server_default=text("true"), init=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
+    last_used: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), init=False
+    )
+
+    # Usage tracking - bump with atomic UPDATE ... SET request_count =
+    # request_count + :n increments, never read-modify-write
+    request_count: Mapped[int] = mapped_column(server_default=text("0"), init=False)
+    total_tokens: Mapped[int] = mapped_column(server_default=text("0"), init=False)
+
+    # Relationships - ciphertext lives in api_key_secrets and is only
+    # fetched when actually dispatching a call, never on listing paths
+    organization: Mapped["Organization"] = relationship(lazy="raise", init=False)
+    secret: Mapped[Optional["APIKeySecret"]] = relationship(
+        lazy="raise", init=False
+    )
+
+
+class APIKeySecret(Base):
+    """
+    Cold secret material for an API key.
+
+    Kept out of the api_keys row so listing keys and bumping usage
+    counters never drags the ciphertext through the buffer pool; load
+    explicitly (session.get) only when a call is being dispatched.
+    """
+    __tablename__ = "api_key_secrets"
+
+    api_key_id: Mapped[int] = mapped_column(
+        ForeignKey("api_keys.id", ondelete="CASCADE"), primary_key=True
+    )
+    ciphertext: Mapped[str] = mapped_column(String(500))
+    key_version: Mapped[int] = mapped_column(server_default=text("1"), init=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), init=False
+    )
 
 
 class AuditLog(Base):
     """Audit logging for compliance"""
     __tablename__ = "audit_logs"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    action = Column(String(100), nullable=False)
-    resource_type = Column(String(50), nullable=False)
-    resource_id = Column(String(100))
-    ip_address = Column(String(45))
-    user_agent = Column(String(500))
-    details = Column(JSON, default={})
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
-    
\ No newline at end of file
+    # Append-only and queried over recent windows - partitioned monthly
+    # like messages (see Message for the PK rationale)
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, index=True,
+        insert_default=_ulid_as_uuid, init=False
+    )
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id"))
+    action: Mapped[str] = mapped_column(String(100))
+    resource_type: Mapped[str] = mapped_column(String(50))
+    user_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("users.id"), default=None
+    )
+    resource_id: Mapped[Optional[str]] = mapped_column(String(100), default=None)
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45), default=None)
+    user_agent: Mapped[Optional[str]] = mapped_column(String(500), default=None)
+    # Deferred: potentially large blobs that listing/export queries skip
+    details: Mapped[dict] = mapped_column(
+        JSONVariant, server_default=text("'{}'"), default_factory=dict,
+        deferred=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now(),
+        init=False
+    )
+
+
+# Audit queries are always org-scoped over a recent time window
+Index("ix_audit_org_created", AuditLog.organization_id, AuditLog.created_at)
+
+# Compliance filters probe into details (details @> '{"action_type": ...}');
+# GIN turns those from full scans into index lookups. Postgres-only.
+Index("ix_audit_details_gin", AuditLog.details, postgresql_using="gin")
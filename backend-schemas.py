@@ -4,7 +4,8 @@ Authentication schemas
 """
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from enum import IntEnum
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 
 
 class UserLogin(BaseModel):
@@ -31,8 +32,13 @@ class UserResponse(BaseModel):
     created_at: datetime
     last_login: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+    @field_validator("role", mode="before")
+    @classmethod
+    def _role_name(cls, v):
+        # Stored as an IntEnum code; the API speaks lowercase names
+        return v.name.lower() if isinstance(v, IntEnum) else v
 
 
 class Token(BaseModel):
@@ -53,7 +59,9 @@ Chat schemas
 """
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel
+from enum import IntEnum
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class ChatMessage(BaseModel):
@@ -63,7 +71,7 @@ class ChatMessage(BaseModel):
 
 class ChatResponse(BaseModel):
     conversation_id: int
-    message_id: int
+    message_id: UUID
     content: str
     model_used: str
     token_count: int
@@ -72,17 +80,26 @@ class ChatResponse(BaseModel):
 
 
 class MessageResponse(BaseModel):
-    id: int
+    id: UUID
     content: str
     message_type: str
     model_used: Optional[str] = None
     token_count: int
     processing_time: float
     created_at: datetime
-    metadata: Dict[str, Any] = {}
+    # ORM attribute is message_metadata (SQLAlchemy reserves .metadata);
+    # the API field name stays "metadata"
+    metadata: Dict[str, Any] = Field(default_factory=dict, alias="message_metadata")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(
+        from_attributes=True, populate_by_name=True, frozen=True, extra="ignore"
+    )
+
+    @field_validator("message_type", mode="before")
+    @classmethod
+    def _message_type_name(cls, v):
+        # Stored as an IntEnum code; the API speaks lowercase names
+        return v.name.lower() if isinstance(v, IntEnum) else v
 
 
 class ConversationCreate(BaseModel):
@@ -99,8 +116,12 @@ class ConversationResponse(BaseModel):
     message_count: int
     messages: Optional[List[MessageResponse]] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+
+class MessageList(BaseModel):
+    items: List[MessageResponse]
+    next_cursor: Optional[UUID] = None
 
 
 class ConversationList(BaseModel):
@@ -114,9 +135,10 @@ class ConversationList(BaseModel):
 """
 User management schemas
 """
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr
+from enum import IntEnum
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 
 
 class UserCreate(BaseModel):
@@ -124,7 +146,9 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
     full_name: Optional[str] = None
-    role: Optional[str] = "user"
+    # Literal validates against a perfect-hash set in pydantic-core; the
+    # matching DB CHECK constraint backstops anything that sidesteps the API
+    role: Literal["admin", "user", "viewer"] = "user"
     organization_id: int
 
 
@@ -143,14 +167,18 @@ class UserInDB(BaseModel):
     role: str
     organization_id: int
     is_active: bool
-    preferred_model: str
+    preferred_model: Optional[str] = None
     ui_theme: str
     created_at: datetime
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+    @field_validator("role", mode="before")
+    @classmethod
+    def _role_name(cls, v):
+        return v.name.lower() if isinstance(v, IntEnum) else v
 
 
 # app/schemas/training.py
@@ -159,8 +187,8 @@ Training schemas
 """
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from pydantic import BaseModel
-from enum import Enum
+from pydantic import BaseModel, ConfigDict, field_validator
+from enum import Enum, IntEnum
 
 
 class TrainingStatus(str, Enum):
@@ -193,8 +221,12 @@ class TrainingJobResponse(BaseModel):
     error_message: Optional[str] = None
     training_metrics: Dict[str, Any] = {}
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _status_name(cls, v):
+        return v.name.lower() if isinstance(v, IntEnum) else v
 
 
 class DocumentUpload(BaseModel):
@@ -217,8 +249,7 @@ class DocumentResponse(BaseModel):
     created_at: datetime
     processed_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 # app/schemas/organization.py
@@ -227,7 +258,7 @@ Organization schemas
 """
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class OrganizationCreate(BaseModel):
@@ -257,5 +288,31 @@ class OrganizationResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
+# app/schemas/batch.py
+"""
+Batch request schemas
+"""
+from typing import Any, List, Optional, Dict
+from pydantic import BaseModel
+
+
+class BatchSubRequest(BaseModel):
+    method: str = "GET"
+    path: str
+    params: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest]
+
+
+class BatchSubResponse(BaseModel):
+    status: int
+    data: Optional[Any] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
@@ -0,0 +1,150 @@
+"""
+Security utilities - JWT handling, password hashing, current-user dependency
+"""
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
+from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.models import User
+
+# Password hashing context - argon2 (CFFI-backed) for new hashes; bcrypt
+# stays registered as deprecated so existing hashes verify and get
+# re-hashed on next successful login (AuthService.authenticate_user)
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+
+# OAuth2 scheme - token endpoint lives under the auth router
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
+# Short-TTL caches so hot authenticated traffic skips the per-request
+# JWT verify + user SELECT. Keyed by a truncated SHA-256 of the token;
+# TTLs are kept well below token lifetime so revocation lag is bounded.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)   # token hash -> user_id
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)     # user_id -> User
+_revoked_tokens: TTLCache = TTLCache(maxsize=10000, ttl=3600)  # token hash -> True
+
+# Verification results, keyed by sha256(plaintext + hash) - the plaintext
+# itself is never stored. Rapid re-fire logins from the same client reuse
+# the verified result for a few seconds instead of re-running argon2.
+_verify_cache: TTLCache = TTLCache(maxsize=4096, ttl=30)
+
+
+def _token_key(token: str) -> bytes:
+    """Stable short cache key for a bearer token"""
+    return hashlib.sha256(token.encode()).digest()[:16]
+
+
+def revoke_token(token: str) -> None:
+    """Mark a token as revoked and drop it from the auth caches"""
+    key = _token_key(token)
+    _revoked_tokens[key] = True
+    user_id = _token_cache.pop(key, None)
+    if user_id is not None:
+        _user_cache.pop(user_id, None)
+
+
+# Pre-built hash verified when the user doesn't exist, so the lookup-miss
+# path costs the same as a real verification (no user enumeration by timing)
+DUMMY_PASSWORD_HASH = pwd_context.hash("olian-dummy-password")
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a plaintext password against its hash.
+
+    Hash verification costs tens of ms of CPU by design; it runs in a
+    worker thread so the event loop keeps serving other requests, and a
+    short-TTL cache absorbs immediate retries of the same credentials.
+    """
+    key = hashlib.sha256(
+        plain_password.encode() + b"\x00" + hashed_password.encode()
+    ).digest()
+    cached = _verify_cache.get(key)
+    if cached is not None:
+        return cached
+    result = await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
+    _verify_cache[key] = result
+    return result
+
+
+async def get_password_hash(password: str) -> str:
+    """Hash a plaintext password for storage (offloaded like verification)"""
+    return await asyncio.to_thread(pwd_context.hash, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash uses a deprecated scheme (e.g. bcrypt)"""
+    return pwd_context.needs_update(hashed_password)
+
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a signed JWT access token"""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (
+        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Dependency that resolves the authenticated user from a JWT token.
+
+    Declared async so FastAPI runs it on the event loop instead of
+    offloading to the threadpool; the JWT decode is cheap CPU work and
+    the user lookup awaits the async session directly.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    key = _token_key(token)
+    if key in _revoked_tokens:
+        raise credentials_exception
+
+    # Cache hit path: skip both the JWT decode and the user SELECT
+    cached_user_id = _token_cache.get(key)
+    if cached_user_id is not None:
+        cached_user = _user_cache.get(cached_user_id)
+        if cached_user is not None:
+            return cached_user
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        username: Optional[str] = payload.get("sub")
+        if username is None:
+            raise credentials_exception
+    except JWTError:
+        raise credentials_exception
+
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalar_one_or_none()
+
+    if user is None:
+        raise credentials_exception
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+
+    _token_cache[key] = user.id
+    _user_cache[user.id] = user
+
+    return user